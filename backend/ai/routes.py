@@ -80,7 +80,7 @@ def add_message(chat_id: str):
 	if not user_id:
 		return jsonify({"error": "unauthorized"}), 401
 	db = get_db()
-	chat = db.ai_chats.find_one({"_id": ObjectId(chat_id), "user_id": ObjectId(user_id)})
+	chat = db.ai_chats.find_one({"_id": ObjectId(chat_id), "user_id": ObjectId(user_id)}, {"_id": 1})
 	if not chat:
 		return jsonify({"error": "not found"}), 404
 	msg = {
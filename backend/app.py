@@ -6,6 +6,18 @@ from dotenv import load_dotenv
 from config import Config
 from db import init_app_db
 
+# Forced MIME types for served uploads (critical for Chromium video playback)
+UPLOAD_MIME_TYPES = {
+	'.mp4': 'video/mp4',
+	'.webm': 'video/webm',
+	'.avi': 'video/x-msvideo',
+	'.mov': 'video/quicktime',
+	'.jpg': 'image/jpeg',
+	'.jpeg': 'image/jpeg',
+	'.png': 'image/png',
+	'.gpx': 'application/gpx+xml',
+}
+
 
 def create_app() -> Flask:
 	load_dotenv()
@@ -35,7 +47,7 @@ def create_app() -> Flask:
 	from dashboard.routes import dashboard_bp
 	from categories.routes import categories_bp, master_bp
 	from ai.routes import ai_bp
-	from tiles.routes import tiles_bp
+	from tiles.routes import tiles_bp, get_tile_db_connection
 	from frames.routes import frames_bp
 
 	app.register_blueprint(auth_bp, url_prefix="/api/auth")
@@ -50,6 +62,9 @@ def create_app() -> Flask:
 	app.register_blueprint(tiles_bp, url_prefix="/api/tiles")
 	app.register_blueprint(frames_bp, url_prefix="/api/frames")
 
+	# Open the offline tiles database at startup so the first map load doesn't pay for it
+	get_tile_db_connection()
+
 	# Handle OPTIONS requests globally (CORS preflight)
 	@app.before_request
 	def handle_preflight():
@@ -67,6 +82,7 @@ def create_app() -> Flask:
 	upload_dir = os.getenv("UPLOAD_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")
 	print(f"[UPLOADS] Upload directory: {upload_dir}")
 	print(f"[UPLOADS] Upload directory exists: {os.path.exists(upload_dir)}")
+	uploads_debug = app.config.get("UPLOADS_DEBUG", False)
 
 	@ app.route('/uploads/<path:filename>')
 	def uploaded_file(filename: str):
@@ -75,35 +91,23 @@ def create_app() -> Flask:
 
 		# Construct the full path to handle subdirectories
 		file_path = os.path.join(upload_dir, filename)
-		print(f"[UPLOADS] Requested: {filename}")
-		print(f"[UPLOADS] Full path: {file_path}")
-		print(f"[UPLOADS] Exists: {os.path.exists(file_path)}")
-
-		if os.path.exists(file_path) and os.path.isfile(file_path):
-			# Determine MIME type based on file extension
-			mimetype, _ = mimetypes.guess_type(file_path)
-
-			# Force correct MIME types for video files (critical for Chromium browsers)
-			if filename.lower().endswith('.mp4'):
-				mimetype = 'video/mp4'
-			elif filename.lower().endswith('.webm'):
-				mimetype = 'video/webm'
-			elif filename.lower().endswith('.avi'):
-				mimetype = 'video/x-msvideo'
-			elif filename.lower().endswith('.mov'):
-				mimetype = 'video/quicktime'
-			elif filename.lower().endswith('.jpg') or filename.lower().endswith('.jpeg'):
-				mimetype = 'image/jpeg'
-			elif filename.lower().endswith('.png'):
-				mimetype = 'image/png'
-			elif filename.lower().endswith('.gpx'):
-				mimetype = 'application/gpx+xml'
+		is_file = os.path.isfile(file_path)
+		if uploads_debug:
+			print(f"[UPLOADS] Requested: {filename}")
+			print(f"[UPLOADS] Full path: {file_path}")
+			print(f"[UPLOADS] Exists: {is_file}")
+
+		if is_file:
+			# Determine MIME type based on file extension, forcing known upload types
+			ext = os.path.splitext(filename)[1].lower()
+			mimetype = UPLOAD_MIME_TYPES.get(ext) or mimetypes.guess_type(file_path)[0]
 
 			# Default to octet-stream if type is unknown
 			if not mimetype:
 				mimetype = 'application/octet-stream'
 
-			print(f"[UPLOADS] Serving with MIME type: {mimetype}")
+			if uploads_debug:
+				print(f"[UPLOADS] Serving with MIME type: {mimetype}")
 
 			# Send file with proper MIME type and headers for video streaming
 			response = make_response(send_file(
@@ -120,16 +124,17 @@ def create_app() -> Flask:
 
 		# File not found - provide detailed error for debugging
 		parent_dir = os.path.dirname(file_path)
+		parent_is_dir = os.path.isdir(parent_dir)
 		error_msg = {
 			"error": "File not found",
 			"requested_file": filename,
 			"full_path": file_path,
 			"upload_dir": upload_dir,
-			"parent_exists": os.path.exists(parent_dir)
+			"parent_exists": parent_is_dir or os.path.exists(parent_dir)
 		}
 
 		# List files in parent directory if it exists
-		if os.path.exists(parent_dir) and os.path.isdir(parent_dir):
+		if parent_is_dir:
 			try:
 				files_in_dir = os.listdir(parent_dir)
 				error_msg["files_in_parent"] = files_in_dir[:20]  # Limit to 20 files
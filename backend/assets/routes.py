@@ -10,6 +10,18 @@ from utils.response import mongo_response
 assets_bp = Blueprint("assets", __name__)
 
 
+def _sync_condition_lower(doc: dict) -> dict:
+	# Keep the indexed lower-cased copy of `condition` in sync on every write;
+	# returns the fields to $unset when `condition` is cleared or not a string
+	doc.pop("condition_lower", None)
+	if "condition" not in doc:
+		return {}
+	if isinstance(doc["condition"], str):
+		doc["condition_lower"] = doc["condition"].lower()
+		return {}
+	return {"condition_lower": ""}
+
+
 @assets_bp.get("/")
 @role_required(["admin", "surveyor", "viewer"])
 def list_assets():
@@ -25,7 +37,7 @@ def list_assets():
 	if category:
 		query["category"] = category
 	if condition:
-		query["condition"] = condition
+		query["condition_lower"] = condition.lower()
 	db = get_db()
 	items = list(db.assets.find(query).sort("detected_at", DESCENDING).limit(1000))
 	return mongo_response({"items": items, "count": len(items)})
@@ -50,6 +62,7 @@ def bulk_insert():
 		return jsonify({"error": "assets array required"}), 400
 	for a in assets:
 		a.setdefault("detected_at", get_now_iso())
+		_sync_condition_lower(a)
 	db = get_db()
 	res = db.assets.insert_many(assets)
 	return jsonify({"inserted": len(res.inserted_ids)})
@@ -59,8 +72,12 @@ def bulk_insert():
 @role_required(["admin", "surveyor"])
 def update_asset(asset_id: str):
 	body = request.get_json(silent=True) or {}
+	update = {"$set": body}
+	unset = _sync_condition_lower(body)
+	if unset:
+		update["$unset"] = unset
 	db = get_db()
-	res = db.assets.find_one_and_update({"_id": ObjectId(asset_id)}, {"$set": body})
+	res = db.assets.find_one_and_update({"_id": ObjectId(asset_id)}, update)
 	if not res:
 		return jsonify({"error": "not found"}), 404
 	return jsonify({"ok": True})
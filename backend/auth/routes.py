@@ -137,7 +137,10 @@ def me():
 	db = get_db()
 	try:
 		from bson import ObjectId
-		user = db.users.find_one({"_id": ObjectId(identity)})
+		user = db.users.find_one(
+			{"_id": ObjectId(identity)},
+			{"email": 1, "name": 1, "first_name": 1, "last_name": 1, "organisation": 1, "role": 1},
+		)
 	except:
 		user = None
 
@@ -17,4 +17,6 @@ class Config:
 		self.AWS_REGION = os.getenv("AWS_REGION", "ap-south-1")
 		self.AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
 		self.AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+		# Per-request logging for /uploads (off by default; video seeking issues many range requests)
+		self.UPLOADS_DEBUG = os.getenv("UPLOADS_DEBUG", "").lower() in ("1", "true", "yes")
 
@@ -12,14 +12,23 @@ def kpis():
 	timeframe = request.args.get("timeframe", "week")
 	db = get_db()
 	total_assets = db.assets.estimated_document_count()
-	total_anomalies = db.assets.count_documents({"condition": "Poor"})
-	good = db.assets.count_documents({"condition": "Good"})
-	fair = db.assets.count_documents({"condition": "Fair"})
-	poor = total_anomalies
+	# One pass over the condition index instead of a count per condition
+	by_condition = {
+		d["_id"]: d["count"]
+		for d in db.assets.aggregate([
+			{"$match": {"condition_lower": {"$in": ["good", "fair", "poor"]}}},
+			{"$group": {"_id": "$condition_lower", "count": {"$sum": 1}}},
+		])
+	}
+	good = by_condition.get("good", 0)
+	fair = by_condition.get("fair", 0)
+	poor = by_condition.get("poor", 0)
+	total_anomalies = poor
 	# Simple approx for kmSurveyed: distinct route_ids surveyed in timeframe not implemented, fallback total roads length
-	km_surveyed = float(db.roads.aggregate([
+	km_row = next(db.roads.aggregate([
 		{"$group": {"_id": None, "km": {"$sum": {"$ifNull": ["$estimated_distance_km", 0]}}}}
-	]).next().get("km", 0)) if db.roads.estimated_document_count() else 0.0
+	]), None)
+	km_surveyed = float(km_row.get("km", 0)) if km_row else 0.0
 	return jsonify({
 		"totalAssets": total_assets,
 		"totalAnomalies": total_anomalies,
@@ -46,7 +55,7 @@ def assets_by_category():
 def anomalies_by_category():
 	db = get_db()
 	agg = db.assets.aggregate([
-		{"$match": {"condition": "Poor"}},
+		{"$match": {"condition_lower": "poor"}},
 		{"$group": {"_id": "$category", "count": {"$sum": 1}}},
 		{"$sort": {"count": -1}},
 		{"$limit": 10},
@@ -59,36 +68,50 @@ def anomalies_by_category():
 def top_anomaly_roads():
 	db = get_db()
 	agg = db.assets.aggregate([
-		{"$match": {"condition": "Poor"}},
+		{"$match": {"condition_lower": "poor"}},
 		{"$group": {"_id": "$route_id", "count": {"$sum": 1}}},
 		{"$sort": {"count": -1}},
 		{"$limit": 5},
+		# Join road names server-side instead of a find_one per row
+		{"$lookup": {
+			"from": "roads",
+			"let": {"rid": "$_id"},
+			"pipeline": [
+				{"$match": {"$expr": {"$eq": ["$route_id", "$$rid"]}}},
+				{"$project": {"_id": 0, "road_name": 1}},
+				{"$limit": 1},
+			],
+			"as": "road",
+		}},
 	])
 	items = []
 	for d in agg:
-		route_id = d.get("_id")
-		road = db.roads.find_one({"route_id": route_id})
-		items.append({"road": road.get("road_name") if road else f"Route {route_id}", "count": d.get("count", 0)})
+		road = d["road"][0] if d.get("road") else None
+		items.append({"road": road.get("road_name") if road else f"Route {d.get('_id')}", "count": d.get("count", 0)})
 	return jsonify({"items": items})
 
 
 @dashboard_bp.get("/recent-surveys")
 def recent_surveys():
 	db = get_db()
-	cursor = db.surveys.find().sort("survey_date", -1).limit(5)
+	surveys = list(db.surveys.find().sort("survey_date", -1).limit(5))
+	# Resolve road names for all surveys in one query
+	route_ids = list(dict.fromkeys(s.get("route_id") for s in surveys))
+	road_names = {
+		r["route_id"]: r.get("road_name")
+		for r in db.roads.find({"route_id": {"$in": route_ids}}, {"route_id": 1, "road_name": 1})
+	}
 	items = []
-	for s in cursor:
-		road = db.roads.find_one({"route_id": s.get("route_id")})
+	for s in surveys:
+		road_name = road_names.get(s.get("route_id"))
 		items.append({
-			"road": road.get("road_name") if road else f"Route {s.get('route_id')}",
+			"road": road_name if s.get("route_id") in road_names else f"Route {s.get('route_id')}",
 			"date": s.get("survey_date"),
 			"assets": s.get("totals", {}).get("total_assets", 0),
 			"surveyor": s.get("surveyor_name"),
 		})
 	return jsonify({"items": items})
 
-	return jsonify({"items": items})
-
 
 @dashboard_bp.get("/monitoring/status")
 def monitoring_status():
@@ -1,28 +1,33 @@
+import threading
 from typing import Any
 
 from flask import Flask, g
-from pymongo import MongoClient, ASCENDING, DESCENDING, TEXT
+from pymongo import MongoClient, UpdateOne, ASCENDING, DESCENDING, TEXT
 
 
 client: MongoClient | None = None
+_client_lock = threading.Lock()
 
 
 def get_client(app: Flask) -> MongoClient:
 	global client  # noqa: WPS420
 	if client is None:
-		# Configure connection pool and timeouts for multiple services
-		client = MongoClient(
-			app.config["MONGO_URI"],
-			uuidRepresentation="standard",
-			maxPoolSize=50,  # Allow more connections
-			minPoolSize=10,
-			maxIdleTimeMS=45000,
-			serverSelectionTimeoutMS=5000,
-			connectTimeoutMS=10000,
-			socketTimeoutMS=45000,
-			retryWrites=True,
-			w='majority'
-		)
+		# Request threads and background jobs may race here; build the pool once
+		with _client_lock:
+			if client is None:
+				# Configure connection pool and timeouts for multiple services
+				client = MongoClient(
+					app.config["MONGO_URI"],
+					uuidRepresentation="standard",
+					maxPoolSize=50,  # Allow more connections
+					minPoolSize=10,
+					maxIdleTimeMS=45000,
+					serverSelectionTimeoutMS=5000,
+					connectTimeoutMS=10000,
+					socketTimeoutMS=45000,
+					retryWrites=True,
+					w='majority'
+				)
 	return client
 
 
@@ -34,6 +39,14 @@ def get_db() -> Any:
 	return client_local[app.config["MONGO_DB_NAME"]]
 
 
+def _drop_indexes(collection: Any, names: list[str]) -> None:
+	# Remove superseded indexes left on existing deployments
+	existing = collection.index_information()
+	for name in names:
+		if name in existing:
+			collection.drop_index(name)
+
+
 def init_app_db(app: Flask) -> None:
 	@app.before_request
 	def attach_app_to_g():  # type: ignore[no-redef]
@@ -89,11 +102,54 @@ def init_app_db(app: Flask) -> None:
 	db["videos"].create_index([("status", ASCENDING)], name="idx_videos_status")
 	db["videos"].create_index([("created_at", DESCENDING)], name="idx_videos_created")
 
-	# Assets
-	db["assets"].create_index([("survey_id", ASCENDING)], name="idx_assets_survey")
-	db["assets"].create_index([("route_id", ASCENDING)], name="idx_assets_route")
+	# Frames
+	db["frames"].create_index(
+		[("video_id", ASCENDING), ("frame_number", ASCENDING), ("created_at", DESCENDING)],
+		name="idx_frames_video_frame",
+	)
+	db["frames"].create_index([("route_id", ASCENDING), ("timestamp", ASCENDING)], name="idx_frames_route_ts")
+	db["frames"].create_index([("survey_id", ASCENDING), ("frame_number", ASCENDING)], name="idx_frames_survey_frame")
+	# Frames-with-detections listing: equality filter, then sort by detection count
+	db["frames"].create_index([("detections_count", DESCENDING)], name="idx_frames_detections")
+	db["frames"].create_index([("video_id", ASCENDING), ("detections_count", DESCENDING)], name="idx_frames_video_detections")
+	db["frames"].create_index([("route_id", ASCENDING), ("detections_count", DESCENDING)], name="idx_frames_route_detections")
+
+	# Assets: backfill the lower-cased condition used for case-insensitive, index-backed matching
+	try:
+		db["assets"].update_many(
+			{"$and": [
+				{"condition_lower": {"$exists": False}},
+				{"condition": {"$type": "string"}},
+			]},
+			[{"$set": {"condition_lower": {"$toLower": "$condition"}}}],
+		)
+	except Exception:
+		# Servers without pipeline updates: backfill every asset in batched bulk writes
+		ops = []
+		for a in db["assets"].find({"$and": [
+			{"condition_lower": {"$exists": False}},
+			{"condition": {"$type": "string"}},
+		]}, {"condition": 1}):
+			ops.append(UpdateOne({"_id": a["_id"]}, {"$set": {"condition_lower": a["condition"].lower()}}))
+			if len(ops) >= 1000:
+				db["assets"].bulk_write(ops, ordered=False)
+				ops = []
+		if ops:
+			db["assets"].bulk_write(ops, ordered=False)
+
 	db["assets"].create_index([("category", ASCENDING)], name="idx_assets_category")
-	db["assets"].create_index([("condition", ASCENDING)], name="idx_assets_condition")
+	db["assets"].create_index([("survey_id", ASCENDING), ("condition_lower", ASCENDING)], name="idx_assets_survey_condition")
+	# list_assets filters by survey or route and sorts newest-first
+	db["assets"].create_index([("detected_at", DESCENDING)], name="idx_assets_detected")
+	db["assets"].create_index([("route_id", ASCENDING), ("detected_at", DESCENDING)], name="idx_assets_route_detected")
+	db["assets"].create_index([("survey_id", ASCENDING), ("detected_at", DESCENDING)], name="idx_assets_survey_detected")
+	# Prefixes of the two indexes above
+	_drop_indexes(db["assets"], ["idx_assets_route", "idx_assets_survey"])
+	# Covering indexes for dashboard anomaly breakdowns ($match condition, $group field)
+	db["assets"].create_index([("condition_lower", ASCENDING), ("category", ASCENDING)], name="idx_assets_condition_lower_category")
+	db["assets"].create_index([("condition_lower", ASCENDING), ("route_id", ASCENDING)], name="idx_assets_condition_lower_route")
+	# Superseded by the condition_lower indexes
+	_drop_indexes(db["assets"], ["idx_assets_condition"])
 	# Geo index (2dsphere)
 	db["assets"].create_index([("location", "2dsphere")], name="idx_assets_geo")
 
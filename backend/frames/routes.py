@@ -1,5 +1,8 @@
 """Frame Management Routes"""
 
+import threading
+import time
+
 from flask import Blueprint, jsonify, request, Response
 from bson import ObjectId, json_util
 from db import get_db
@@ -7,6 +10,11 @@ from utils.rbac import role_required
 
 frames_bp = Blueprint("frames", __name__)
 
+# Per-video frame statistics, cached briefly to avoid re-aggregating on every poll
+STATS_CACHE_TTL_SECONDS = 30
+_video_stats_cache = {}
+_video_stats_lock = threading.Lock()
+
 
 @frames_bp.get("/")
 @role_required(["admin", "surveyor", "viewer"])
@@ -50,7 +58,14 @@ def list_frames():
     cursor = db.frames.find(query).sort("frame_number", 1).skip(offset).limit(limit)
     frames = list(cursor)
 
-    total = db.frames.count_documents(query)
+    # A short page (that isn't past the end) already tells us the total
+    if len(frames) < limit and (frames or offset == 0):
+        total = offset + len(frames)
+    elif not query:
+        # Unfiltered listing: collection metadata count, no scan
+        total = db.frames.estimated_document_count()
+    else:
+        total = db.frames.count_documents(query)
 
     # Use bson.json_util to handle ObjectId serialization
     return Response(
@@ -89,16 +104,27 @@ def get_video_frames(video_id: str):
     """Get all frames for a specific video."""
     db = get_db()
 
-    frames = list(db.frames.find({"video_id": video_id}).sort("frame_number", 1))
-
-    return Response(
-        json_util.dumps({
-            "video_id": video_id,
-            "frames": frames,
-            "total": len(frames)
-        }),
-        mimetype="application/json"
-    ), 200
+    cursor = db.frames.find({"video_id": video_id}).sort("frame_number", 1)
+
+    # Stream frames as they come off the cursor rather than building the
+    # whole (potentially very large) payload in memory first
+    def generate():
+        yield '{"video_id": ' + json_util.dumps(video_id) + ', "frames": ['
+        total = 0
+        try:
+            for frame in cursor:
+                yield (", " if total else "") + json_util.dumps(frame)
+                total += 1
+        except Exception as e:
+            # Headers are already sent; close the document and report the partial listing
+            print(f"[FRAMES] Streaming frames for video {video_id} failed after {total} frames: {e}")
+            yield '], "total": ' + str(total) + ', "error": ' + json_util.dumps(str(e)) + '}'
+            return
+        finally:
+            cursor.close()
+        yield '], "total": ' + str(total) + '}'
+
+    return Response(generate(), mimetype="application/json"), 200
 
 
 @frames_bp.get("/route/<int:route_id>")
@@ -156,7 +182,41 @@ def get_frames_with_detections():
 @role_required(["admin", "surveyor", "viewer"])
 def get_video_frame_stats(video_id: str):
     """Get statistics about frames for a video."""
-    db = get_db()
+    cached = _video_stats_cache.get(video_id)
+    if cached and time.monotonic() - cached[0] < STATS_CACHE_TTL_SECONDS:
+        return jsonify(cached[1]), 200
+
+    stats = _compute_video_frame_stats(get_db(), video_id)
+
+    # Only the cache update is locked, so misses for different videos run concurrently
+    with _video_stats_lock:
+        now = time.monotonic()
+        expired = [k for k, (ts, _) in _video_stats_cache.items() if now - ts >= STATS_CACHE_TTL_SECONDS]
+        for k in expired:
+            del _video_stats_cache[k]
+        _video_stats_cache[video_id] = (now, stats)
+    return jsonify(stats), 200
+
+
+def _compute_video_frame_stats(db, video_id: str) -> dict:
+    """Compute frame statistics for a video, bypassing the cache."""
+    # Videos processed by the SageMaker pipeline carry their frame stats once completed
+    video = None
+    if ObjectId.is_valid(video_id):
+        video = db.videos.find_one(
+            {"_id": ObjectId(video_id)},
+            {"status": 1, "processed_frames": 1, "frames_with_detections": 1, "total_detections": 1}
+        )
+    if video and video.get("status") == "completed" and "frames_with_detections" in video:
+        total_frames = video.get("processed_frames", 0)
+        total_detections = video.get("total_detections", 0)
+        return {
+            "video_id": video_id,
+            "total_frames": total_frames,
+            "frames_with_detections": video["frames_with_detections"],
+            "total_detections": total_detections,
+            "avg_detections_per_frame": total_detections / total_frames if total_frames else 0
+        }
 
     pipeline = [
         {"$match": {"video_id": video_id}},
@@ -175,16 +235,15 @@ def get_video_frame_stats(video_id: str):
 
     result = list(db.frames.aggregate(pipeline))
     if not result:
-        return jsonify({
+        return {
             "video_id": video_id,
             "total_frames": 0,
             "frames_with_detections": 0,
             "total_detections": 0,
             "avg_detections_per_frame": 0
-        }), 200
+        }
 
     stats = result[0]
     stats.pop("_id", None)
     stats["video_id"] = video_id
-
-    return jsonify(stats), 200
+    return stats
@@ -7,6 +7,23 @@ from utils.rbac import role_required
 
 roads_bp = Blueprint("roads", __name__)
 
+# Fields returned by the road listing, in response order
+ROAD_LIST_FIELDS = (
+	"route_id",
+	"road_name",
+	"start_point_name",
+	"start_lat",
+	"start_lng",
+	"end_point_name",
+	"end_lat",
+	"end_lng",
+	"estimated_distance_km",
+	"road_type",
+	"road_side",
+	"gpx_file_url",
+)
+ROAD_LIST_PROJECTION = {"_id": 0, **{f: 1 for f in ROAD_LIST_FIELDS}}
+
 
 @roads_bp.get("/")
 @role_required(["admin", "surveyor", "viewer"])
@@ -23,23 +40,8 @@ def list_roads():
 		query["road_side"] = road_side
 
 	db = get_db()
-	cursor = db.roads.find(query).sort("route_id", ASCENDING)
-	roads = []
-	for r in cursor:
-		roads.append({
-			"route_id": r.get("route_id"),
-			"road_name": r.get("road_name"),
-			"start_point_name": r.get("start_point_name"),
-			"start_lat": r.get("start_lat"),
-			"start_lng": r.get("start_lng"),
-			"end_point_name": r.get("end_point_name"),
-			"end_lat": r.get("end_lat"),
-			"end_lng": r.get("end_lng"),
-			"estimated_distance_km": r.get("estimated_distance_km"),
-			"road_type": r.get("road_type"),
-			"road_side": r.get("road_side"),
-			"gpx_file_url": r.get("gpx_file_url"),
-		})
+	cursor = db.roads.find(query, ROAD_LIST_PROJECTION).sort("route_id", ASCENDING)
+	roads = [{f: r.get(f) for f in ROAD_LIST_FIELDS} for r in cursor]
 	return jsonify({"items": roads, "count": len(roads)})
 
 
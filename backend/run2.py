@@ -17,6 +17,7 @@ from sagemaker.predictor import Predictor
 from sagemaker.serializers import JSONSerializer
 from sagemaker.deserializers import JSONDeserializer
 import concurrent.futures
+from collections import Counter
 from typing import Tuple, Dict, Optional, Callable
 
 
@@ -133,7 +134,7 @@ class VideoProcessor:
         """
         # Initialize return values
         draw_frame = frame.copy()
-        detection_stats = {}
+        detection_stats = Counter()
 
         try:
             # Convert frame to PIL Image
@@ -217,7 +218,7 @@ class VideoProcessor:
                     )
 
                     # Track detection stats
-                    detection_stats[class_name] = detection_stats.get(class_name, 0) + 1
+                    detection_stats[class_name] += 1
 
             return draw_frame, detection_stats, frame_idx
 
@@ -291,7 +292,7 @@ class VideoProcessor:
 
         # Step 2: Prepare output buffer
         frames_to_write = [None] * actual_frames
-        global_detection_stats = {}
+        global_detection_stats = Counter()
         processed_count = 0
 
         # Step 3: Process frames with multithreading
@@ -325,9 +326,7 @@ class VideoProcessor:
                         frames_to_write[frame_idx] = annotated_frame
                         
                         # Merge detection stats
-                        for class_name, count in detection_stats.items():
-                            global_detection_stats[class_name] = \
-                                global_detection_stats.get(class_name, 0) + count
+                        global_detection_stats.update(detection_stats)
                         
                         processed_count += 1
                         completed += 1
@@ -390,7 +389,7 @@ class VideoProcessor:
         result = {
             'total_frames': actual_frames,
             'processed_frames': processed_count,
-            'detection_stats': global_detection_stats,
+            'detection_stats': dict(global_detection_stats),
             'total_detections': total_detections,
             'video_duration': actual_frames / fps if fps > 0 else 0,
             'output_path': output_path,
@@ -409,8 +408,7 @@ class VideoProcessor:
         
         if global_detection_stats:
             print("\nDetection breakdown:")
-            for class_name, count in sorted(global_detection_stats.items(), 
-                                          key=lambda x: x[1], reverse=True):
+            for class_name, count in global_detection_stats.most_common():
                 print(f"  {class_name}: {count}")
         else:
             print("\nNo detections found")
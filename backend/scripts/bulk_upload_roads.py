@@ -124,20 +124,15 @@ def get_start_end_names(road_name):
     else:
         return f"{road_name} Point A", f"{road_name} Point B"
 
-def get_next_route_id(db):
-    """Get the next available route_id"""
-    counter = db.counters.find_one({"_id": "route_id"})
-    if not counter:
-        # Initialize counter
-        db.counters.insert_one({"_id": "route_id", "seq": 0})
-        return 1
-
+def reserve_route_ids(db, count):
+    """Reserve `count` consecutive route_ids with a single counter update; returns the first"""
     result = db.counters.find_one_and_update(
         {"_id": "route_id"},
-        {"$inc": {"seq": 1}},
+        {"$inc": {"seq": count}},
+        upsert=True,
         return_document=True
     )
-    return result["seq"]
+    return result["seq"] - count + 1
 
 def bulk_upload_roads():
     """Main function to bulk upload roads"""
@@ -156,10 +151,11 @@ def bulk_upload_roads():
 
     roads_to_insert = []
     total = len(ROADS_DATA)
+    first_route_id = reserve_route_ids(db, total)
+    now_iso = datetime.utcnow().isoformat() + "Z"
 
     for index, (road_name, distance_km) in enumerate(ROADS_DATA):
-        # Get next route_id
-        route_id = get_next_route_id(db)
+        route_id = first_route_id + index
 
         # Generate coordinates
         coords = generate_coordinates(index, total, distance_km)
@@ -186,8 +182,8 @@ def bulk_upload_roads():
             "estimated_distance_km": distance_km,
             "road_type": road_type,
             "road_side": road_side,
-            "created_at": datetime.utcnow().isoformat() + "Z",
-            "updated_at": datetime.utcnow().isoformat() + "Z",
+            "created_at": now_iso,
+            "updated_at": now_iso,
         }
 
         roads_to_insert.append(road_doc)
@@ -204,16 +200,19 @@ def bulk_upload_roads():
         print("Continuing with remaining roads...")
 
     # Verify count
-    total_roads = db.roads.count_documents({})
+    total_roads = db.roads.estimated_document_count()
     print(f"\n📊 Total roads in database: {total_roads}")
 
     print("\n" + "=" * 60)
     print("UPLOAD COMPLETE!")
     print("=" * 60)
     print("\nRoad Type Distribution:")
+    type_counts = {
+        d["_id"]: d["count"]
+        for d in db.roads.aggregate([{"$group": {"_id": "$road_type", "count": {"$sum": 1}}}])
+    }
     for road_type in ["National/Expressway", "Municipal/Urban Road", "Local Access Road"]:
-        count = db.roads.count_documents({"road_type": road_type})
-        print(f"  - {road_type}: {count}")
+        print(f"  - {road_type}: {type_counts.get(road_type, 0)}")
 
     print("\nYou can now view these roads in the frontend at:")
     print("  http://localhost:5173/roads")
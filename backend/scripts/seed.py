@@ -62,6 +62,11 @@ def main():
 		if not data:
 			continue
 		if isinstance(data, list) and data:
+			if coll == "assets":
+				# Dashboards and list_assets match on the indexed lower-cased condition
+				for doc in data:
+					if isinstance(doc.get("condition"), str):
+						doc["condition_lower"] = doc["condition"].lower()
 			print(f"Seeding {len(data)} docs into {coll}")
 			db[coll].insert_many(data, ordered=False)
 
@@ -11,6 +11,7 @@ import os
 import sys
 from datetime import datetime, timedelta
 import random
+from collections import Counter
 from pymongo import MongoClient
 from bson import ObjectId
 
@@ -132,6 +133,7 @@ def seed_assets():
                 "category": category,
                 "type": asset_type,
                 "condition": condition,
+                "condition_lower": condition.lower(),
                 "confidence": confidence + random.uniform(-0.05, 0.05),  # Add some variance
                 "lat": lat,
                 "lng": lng,
@@ -148,23 +150,19 @@ def seed_assets():
         print(f"✅ Successfully inserted {len(result.inserted_ids)} dummy assets!")
 
         # Print statistics
-        total_good = sum(1 for a in assets_to_insert if a['condition'] == 'good')
-        total_fair = sum(1 for a in assets_to_insert if a['condition'] == 'fair')
-        total_poor = sum(1 for a in assets_to_insert if a['condition'] == 'poor')
+        conditions = Counter()
+        categories = Counter()
+        for asset in assets_to_insert:
+            conditions[asset['condition']] += 1
+            categories[asset['category']] += 1
 
         print(f"\n📊 Asset Statistics:")
-        print(f"   Good condition: {total_good}")
-        print(f"   Fair condition: {total_fair}")
-        print(f"   Poor condition: {total_poor}")
-
-        # Count by category
-        categories = {}
-        for asset in assets_to_insert:
-            cat = asset['category']
-            categories[cat] = categories.get(cat, 0) + 1
+        print(f"   Good condition: {conditions['good']}")
+        print(f"   Fair condition: {conditions['fair']}")
+        print(f"   Poor condition: {conditions['poor']}")
 
         print(f"\n📋 By Category:")
-        for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
+        for cat, count in categories.most_common():
             print(f"   {cat}: {count}")
     else:
         print("⚠️ No assets to insert")
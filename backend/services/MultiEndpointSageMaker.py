@@ -4,6 +4,7 @@ import json
 import base64
 import cv2
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 from io import BytesIO
 from PIL import Image
 import concurrent.futures
@@ -149,9 +150,9 @@ class MultiEndpointSageMaker:
         det = {}
         for future in concurrent.futures.as_completed(future_to_model):
             e_type = future_to_model[future]
-            _, result = future.result()
-            if result:
-                det[e_type] = result.get("detections")
+            outcome = future.result()
+            if outcome and outcome[1]:
+                det[e_type] = outcome[1].get("detections")
         return det
 
     def process_video(
@@ -24,11 +24,7 @@ class MonitoringService:
             {"_id": 1, "title": 1, "progress": 1, "updated_at": 1, "size_bytes": 1}
         ).sort("updated_at", DESCENDING)
         
-        uploads = []
-        for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            uploads.append(doc)
-        return uploads
+        return [{**doc, "_id": str(doc["_id"])} for doc in cursor]
 
     def get_active_processing(self) -> List[Dict]:
         """Get list of videos currently processing."""
@@ -37,11 +33,7 @@ class MonitoringService:
             {"_id": 1, "title": 1, "progress": 1, "updated_at": 1, "eta": 1}
         ).sort("updated_at", DESCENDING)
         
-        jobs = []
-        for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            jobs.append(doc)
-        return jobs
+        return [{**doc, "_id": str(doc["_id"])} for doc in cursor]
 
     def get_recent_failures(self, limit: int = 5) -> List[Dict]:
         """Get list of recently failed jobs."""
@@ -50,11 +42,7 @@ class MonitoringService:
             {"_id": 1, "title": 1, "error": 1, "updated_at": 1}
         ).sort("updated_at", DESCENDING).limit(limit)
         
-        failures = []
-        for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            failures.append(doc)
-        return failures
+        return [{**doc, "_id": str(doc["_id"])} for doc in cursor]
 
     def get_system_health(self) -> Dict:
         """Check system resources and external service health."""
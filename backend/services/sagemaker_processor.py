@@ -5,6 +5,7 @@ Handles video processing with SageMaker endpoint, frame extraction, and storage.
 
 import os
 import json
+from collections import Counter
 import cv2
 import boto3
 import base64
@@ -14,14 +15,58 @@ from PIL import Image
 import io
 import numpy as np
 from datetime import datetime
-from datetime import datetime
 from bson import ObjectId
+from pymongo import UpdateOne
 import subprocess
+from functools import lru_cache
+
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_FONT_SCALE = 0.7
+LABEL_THICKNESS = 2
+
+
+@lru_cache(maxsize=4096)
+def _label_text_size(label: str) -> Tuple[Tuple[int, int], int]:
+    """Rendered size of a detection label; labels repeat across frames."""
+    return cv2.getTextSize(label, LABEL_FONT, LABEL_FONT_SCALE, LABEL_THICKNESS)
+
+
+@lru_cache(maxsize=None)
+def _sagemaker_runtime_client(region: str):
+    """SageMaker Runtime client, shared across processors (boto3 clients are thread-safe)."""
+    return boto3.client(
+        'sagemaker-runtime',
+        region_name=region,
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+    )
+
+
+@lru_cache(maxsize=None)
+def _sagemaker_control_client(region: str):
+    """SageMaker control-plane client, shared across processors (boto3 clients are thread-safe)."""
+    return boto3.client(
+        'sagemaker',
+        region_name=region,
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+    )
 
 
 class SageMakerVideoProcessor:
     """Process videos using SageMaker endpoint and extract annotated frames."""
 
+    # Box colors (BGR), assigned to classes in order of first appearance
+    DEFAULT_COLORS = (
+        (0, 255, 0),    # Green
+        (255, 0, 0),    # Blue
+        (0, 0, 255),    # Red
+        (255, 255, 0),  # Cyan
+        (255, 0, 255),  # Magenta
+        (0, 255, 255),  # Yellow
+    )
+
     def __init__(self, endpoint_name: str = None):
         """
         Initialize the SageMaker processor.
@@ -36,12 +81,7 @@ class SageMakerVideoProcessor:
         # Initialize boto3 client for SageMaker Runtime (only if not using mock)
         if self.endpoint_name and self.endpoint_name.lower() != 'mock':
             try:
-                self.sagemaker_runtime = boto3.client(
-                    'sagemaker-runtime',
-                    region_name=self.region,
-                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-                )
+                self.sagemaker_runtime = _sagemaker_runtime_client(self.region)
                 print(f"[SAGEMAKER] Boto3 client initialized for region: {self.region}")
             except Exception as e:
                 print(f"[SAGEMAKER] Warning: Failed to initialize boto3 client: {e}")
@@ -51,13 +91,25 @@ class SageMakerVideoProcessor:
         else:
             self.sagemaker_runtime = None
 
+        # Resolved once; checked for every frame sent to inference
+        self.mock_mode = not self.endpoint_name or self.endpoint_name.lower() == 'mock'
+
+        # Class name -> box color, filled lazily by draw_detections
+        self._class_colors = {}
+
         # Frame extraction interval (process every Nth frame)
         self.frame_interval = int(os.getenv("FRAME_INTERVAL", "3"))
 
+        # Minimum detection confidence kept from endpoint predictions
+        self.confidence_threshold = float(os.getenv("CONFIDENCE_THRESHOLD", "0.25"))
+
+        # Number of frame documents buffered before each MongoDB insert_many
+        self.frame_batch_size = int(os.getenv("FRAME_INSERT_BATCH_SIZE", "100"))
+
         print(f"[SAGEMAKER] Initialized with endpoint: {self.endpoint_name}")
         print(f"[SAGEMAKER] Region: {self.region}")
         print(f"[SAGEMAKER] Frame interval: {self.frame_interval}")
-        print(f"[SAGEMAKER] Mode: {'MOCK' if self.endpoint_name.lower() == 'mock' else 'LIVE'}")
+        print(f"[SAGEMAKER] Mode: {'MOCK' if self.mock_mode else 'LIVE'}")
 
     def _load_endpoint_config(self) -> Optional[str]:
         """
@@ -124,7 +176,7 @@ class SageMakerVideoProcessor:
         Returns:
             Tuple of (is_healthy, message)
         """
-        if not self.endpoint_name or self.endpoint_name.lower() == 'mock':
+        if self.mock_mode:
             msg = f"Endpoint configuration is '{self.endpoint_name}' (Mock mode)"
             print(f"[SAGEMAKER] Health check failed: {msg}")
             return False, msg
@@ -136,12 +188,7 @@ class SageMakerVideoProcessor:
             
         try:
             # We need a sagemaker client (not runtime) to check status
-            sm_client = boto3.client(
-                'sagemaker',
-                region_name=self.region,
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-            )
+            sm_client = _sagemaker_control_client(self.region)
             
             response = sm_client.describe_endpoint(EndpointName=self.endpoint_name)
             status = response['EndpointStatus']
@@ -243,7 +290,9 @@ class SageMakerVideoProcessor:
         # Process frames
         frame_count = 0
         processed_count = 0
-        detections_list = []
+        frames_with_detections = 0
+        detection_counts = Counter()
+        pending_frames = []
         frame_metadata = []
 
         try:
@@ -293,10 +342,10 @@ class SageMakerVideoProcessor:
                             "detections_count": len(detections),
                             "created_at": datetime.utcnow().isoformat()
                         }
-                        try:
-                            db.frames.insert_one(frame_record)
-                        except Exception as e:
-                            print(f"[SAGEMAKER] Warning: Failed to store frame in MongoDB: {e}")
+                        pending_frames.append(frame_record)
+                        if len(pending_frames) >= self.frame_batch_size:
+                            self._store_frames(db, pending_frames)
+                            pending_frames = []
 
                     # Write annotated frame to output video
                     try:
@@ -304,8 +353,10 @@ class SageMakerVideoProcessor:
                     except Exception as e:
                         print(f"[SAGEMAKER] Error writing frame to FFmpeg: {e}")
 
-                    # Store detections
-                    detections_list.extend(detections)
+                    # Tally detections by class
+                    detection_counts.update(det.get('class_name', 'unknown') for det in detections)
+                    if detections:
+                        frames_with_detections += 1
                     processed_count += 1
 
                     # Progress callback
@@ -323,6 +374,8 @@ class SageMakerVideoProcessor:
 
         finally:
             cap.release()
+            if pending_frames:
+                self._store_frames(db, pending_frames)
             if 'ffmpeg_process' in locals():
                 ffmpeg_process.stdin.close()
                 ffmpeg_process.wait()
@@ -336,7 +389,7 @@ class SageMakerVideoProcessor:
         metadata_dir.mkdir(parents=True, exist_ok=True)
         metadata_path = metadata_dir / f"{video_id}_frame_metadata.json"
         with open(metadata_path, 'w') as f:
-            json.dump(frame_metadata, f, indent=2)
+            json.dump(frame_metadata, f, separators=(',', ':'))
 
         print(f"[SAGEMAKER] Processing complete!")
         print(f"[SAGEMAKER] Processed {processed_count} frames")
@@ -354,8 +407,9 @@ class SageMakerVideoProcessor:
             "annotated_video_path": str(output_video_path.relative_to(output_dir.parent)),
             "frames_directory": str(frames_dir.relative_to(output_dir.parent)),
             "frame_metadata_path": str(metadata_path.relative_to(output_dir.parent)),
-            "total_detections": len(detections_list),
-            "detections_summary": self._summarize_detections(detections_list)
+            "frames_with_detections": frames_with_detections,
+            "total_detections": sum(detection_counts.values()),
+            "detections_summary": dict(detection_counts)
         }
 
     def _invoke_sagemaker(self, frame: np.ndarray) -> List[Dict]:
@@ -369,7 +423,7 @@ class SageMakerVideoProcessor:
             List of detections in format:
             [{"class_name": str, "confidence": float, "bbox": {"x1": int, "y1": int, "x2": int, "y2": int}}]
         """
-        if not self.endpoint_name or self.endpoint_name.lower() == 'mock':
+        if self.mock_mode:
             # Use mock detections for testing
             return self._mock_detections()
 
@@ -397,12 +451,10 @@ class SageMakerVideoProcessor:
 
             # Parse response
             result = json.loads(response['Body'].read().decode())
-            print(result)
             # YOLO pipeline format: {"predictions": [{"class_name": str, "confidence": float, "bbox": {...}}, ...]}
             detections = result.get('predictions', [])
-            print(detections)
-            # Filter by confidence threshold (0.25 default)
-            confidence_threshold = float(os.getenv("CONFIDENCE_THRESHOLD", "0.25"))
+            # Filter by confidence threshold
+            confidence_threshold = self.confidence_threshold
             detections = [d for d in detections if d.get('confidence', 0) >= confidence_threshold]
 
             return detections
@@ -455,16 +507,8 @@ class SageMakerVideoProcessor:
         Returns:
             Annotated frame
         """
-        # Color map for different classes
-        class_colors = {}
-        default_colors = [
-            (0, 255, 0),    # Green
-            (255, 0, 0),    # Blue
-            (0, 0, 255),    # Red
-            (255, 255, 0),  # Cyan
-            (255, 0, 255),  # Magenta
-            (0, 255, 255),  # Yellow
-        ]
+        # Color map for different classes, kept stable across frames
+        class_colors = self._class_colors
 
         for detection in detections:
             bbox = detection.get('bbox', {})
@@ -482,8 +526,8 @@ class SageMakerVideoProcessor:
 
             # Assign color to class
             if class_name not in class_colors:
-                color_idx = len(class_colors) % len(default_colors)
-                class_colors[class_name] = default_colors[color_idx]
+                color_idx = len(class_colors) % len(self.DEFAULT_COLORS)
+                class_colors[class_name] = self.DEFAULT_COLORS[color_idx]
 
             color = class_colors[class_name]
 
@@ -492,13 +536,7 @@ class SageMakerVideoProcessor:
 
             # Draw label with background
             label = f"{class_name}: {confidence:.2f}"
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_scale = 0.7
-            thickness = 2
-
-            (label_w, label_h), baseline = cv2.getTextSize(
-                label, font, font_scale, thickness
-            )
+            (label_w, label_h), baseline = _label_text_size(label)
 
             # Label background
             cv2.rectangle(
@@ -514,21 +552,20 @@ class SageMakerVideoProcessor:
                 frame,
                 label,
                 (x1 + 5, y1 - baseline - 5),
-                font,
-                font_scale,
+                LABEL_FONT,
+                LABEL_FONT_SCALE,
                 (255, 255, 255),
-                thickness
+                LABEL_THICKNESS
             )
 
         return frame
 
-    def _summarize_detections(self, detections: List[Dict]) -> Dict:
-        """Summarize detections by class (YOLO format)."""
-        summary = {}
-        for det in detections:
-            class_name = det.get('class_name', 'unknown')
-            summary[class_name] = summary.get(class_name, 0) + 1
-        return summary
+    def _store_frames(self, db, frame_records: List[Dict]):
+        """Insert a batch of frame records into MongoDB."""
+        try:
+            db.frames.insert_many(frame_records, ordered=False)
+        except Exception as e:
+            print(f"[SAGEMAKER] Warning: Failed to store {len(frame_records)} frames in MongoDB: {e}")
 
     def link_frames_to_gpx(
         self,
@@ -555,48 +592,63 @@ class SageMakerVideoProcessor:
         with open(frame_metadata_path, 'r') as f:
             frames = json.load(f)
 
+        # Column arrays of the GPX track (timestamps, lon/lat pairs, altitudes)
+        gpx_timestamps = np.asarray([p.get('timestamp', 0) for p in gpx_data], dtype=np.float64)
+        gpx_coords = np.asarray([(p.get('lon'), p.get('lat')) for p in gpx_data], dtype=np.float64)
+        gpx_altitudes = [p.get('altitude') for p in gpx_data]
+
+        # Find closest GPX point by timestamp for all frames at once
+        order = np.argsort(gpx_timestamps, kind='stable')
+        sorted_ts = gpx_timestamps[order]
+        frame_ts = np.asarray([frame['timestamp'] for frame in frames], dtype=np.float64)
+        right = np.clip(np.searchsorted(sorted_ts, frame_ts), 0, len(sorted_ts) - 1)
+        left = np.clip(right - 1, 0, len(sorted_ts) - 1)
+        use_left = np.abs(frame_ts - sorted_ts[left]) <= np.abs(sorted_ts[right] - frame_ts)
+        nearest = order[np.where(use_left, left, right)]
+
+        coords = gpx_coords[nearest].tolist()
+        matched_ts = gpx_timestamps[nearest].tolist()
+
         # Link each frame to nearest GPX point
         linked_frames = []
-        for frame in frames:
-            timestamp = frame['timestamp']
-
-            # Find closest GPX point by timestamp
-            closest_gpx = min(
-                gpx_data,
-                key=lambda p: abs(p.get('timestamp', 0) - timestamp)
-            )
+        updates = []
+        updated_at = datetime.utcnow().isoformat()
+        for frame, idx, (lon, lat), gpx_timestamp in zip(frames, nearest.tolist(), coords, matched_ts):
+            altitude = gpx_altitudes[idx]
 
             linked_frame = {
                 **frame,
-                "lat": closest_gpx.get('lat'),
-                "lon": closest_gpx.get('lon'),
-                "altitude": closest_gpx.get('altitude'),
-                "gpx_timestamp": closest_gpx.get('timestamp')
+                "lat": lat,
+                "lon": lon,
+                "altitude": altitude,
+                "gpx_timestamp": gpx_timestamp
             }
             linked_frames.append(linked_frame)
 
-            # Update frame in MongoDB with GPS coordinates if db provided
-            if db is not None and video_id:
-                try:
-                    db.frames.update_one(
-                        {
-                            "video_id": video_id,
-                            "frame_number": frame['frame_number']
+            updates.append(UpdateOne(
+                {
+                    "video_id": video_id,
+                    "frame_number": frame['frame_number']
+                },
+                {
+                    "$set": {
+                        "location": {
+                            "type": "Point",
+                            "coordinates": [lon, lat]
                         },
-                        {
-                            "$set": {
-                                "location": {
-                                    "type": "Point",
-                                    "coordinates": [closest_gpx.get('lon'), closest_gpx.get('lat')]
-                                },
-                                "altitude": closest_gpx.get('altitude'),
-                                "gpx_timestamp": closest_gpx.get('timestamp'),
-                                "updated_at": datetime.utcnow().isoformat()
-                            }
-                        }
-                    )
-                except Exception as e:
-                    print(f"[SAGEMAKER] Warning: Failed to update frame GPS in MongoDB: {e}")
+                        "altitude": altitude,
+                        "gpx_timestamp": gpx_timestamp,
+                        "updated_at": updated_at
+                    }
+                }
+            ))
+
+        # Update frames in MongoDB with GPS coordinates if db provided
+        if db is not None and video_id and updates:
+            try:
+                db.frames.bulk_write(updates, ordered=False)
+            except Exception as e:
+                print(f"[SAGEMAKER] Warning: Failed to update frame GPS in MongoDB: {e}")
 
         print(f"[SAGEMAKER] Linked {len(linked_frames)} frames to GPS coordinates")
         return linked_frames
@@ -17,6 +17,7 @@ from sagemaker.predictor import Predictor
 from sagemaker.serializers import JSONSerializer
 from sagemaker.deserializers import JSONDeserializer
 import subprocess
+from collections import Counter
 
 
 class VideoProcessor:
@@ -126,7 +127,7 @@ class VideoProcessor:
 
         frame_count = 0
         processed_count = 0
-        detection_stats = {}
+        detection_stats = Counter()
 
         if progress_callback:
             progress_callback(0, "Starting video processing...")
@@ -219,7 +220,7 @@ class VideoProcessor:
                                 )
 
                                 # Track detection stats
-                                detection_stats[class_name] = detection_stats.get(class_name, 0) + 1
+                                detection_stats[class_name] += 1
 
                         # Write annotated frame
                         try:
@@ -264,7 +265,7 @@ class VideoProcessor:
         return {
             'total_frames': total_frames,
             'processed_frames': processed_count,
-            'detection_stats': detection_stats,
+            'detection_stats': dict(detection_stats),
             'total_detections': total_detections,
             'video_duration': total_frames / fps if fps > 0 else 0,
             'output_path': output_path
@@ -50,12 +50,13 @@ def create_survey():
 
     db = get_db()
     route_id = int(body["route_id"])
-    road = db.roads.find_one({"route_id": route_id})
+    road = db.roads.find_one({"route_id": route_id}, {"_id": 1})
 
     # Calculate survey version for this route
     # Find the latest version for this route_id
     latest_survey = db.surveys.find_one(
         {"route_id": route_id},
+        {"survey_version": 1},
         sort=[("survey_version", DESCENDING)]
     )
     survey_version = (latest_survey.get("survey_version", 0) + 1) if latest_survey else 1
@@ -135,7 +136,7 @@ def delete_survey(survey_id: str):
     db = get_db()
     
     # 1. Find the survey first
-    survey = db.surveys.find_one({"_id": ObjectId(survey_id)})
+    survey = db.surveys.find_one({"_id": ObjectId(survey_id)}, {"route_id": 1})
     if not survey:
         return mongo_response({"error": "Survey not found"}, 404)
     
@@ -143,7 +144,10 @@ def delete_survey(survey_id: str):
     upload_root = Path(os.getenv("UPLOAD_DIR", Path(__file__).resolve().parents[1] / "uploads"))
     
     # 2. Find all videos for this survey
-    videos = list(db.videos.find({"survey_id": ObjectId(survey_id)}))
+    videos = list(db.videos.find(
+        {"survey_id": ObjectId(survey_id)},
+        {"storage_url": 1, "thumbnail_url": 1, "gpx_file_url": 1}
+    ))
     
     deleted_files = []
     preserved_files = []
@@ -68,8 +68,9 @@ def get_tile_info():
         """)
 
         zoom_levels = []
-        for row in cursor.fetchall():
-            z, count, min_x, max_x, min_y, max_y = row
+        total_tiles = 0
+        for z, count, min_x, max_x, min_y, max_y in cursor:
+            total_tiles += count
             zoom_levels.append({
                 "zoom": z,
                 "tile_count": count,
@@ -85,7 +86,7 @@ def get_tile_info():
             "min_zoom": min_zoom,
             "max_zoom": max_zoom,
             "zoom_levels": zoom_levels,
-            "total_tiles": sum(level["tile_count"] for level in zoom_levels),
+            "total_tiles": total_tiles,
             "database_path": TILES_DB_PATH,
             "database_exists": True
         })
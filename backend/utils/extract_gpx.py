@@ -1,5 +1,7 @@
 import os
 import subprocess
+import xml.etree.ElementTree as ET
+from functools import lru_cache
 from pathlib import Path
 
 basedir = Path(os.path.abspath(os.path.dirname(__file__)))
@@ -23,4 +25,39 @@ def extract_gpx(video_path, fmt_file=fmt_file):
         return str(gpx_path)
     except Exception as e:
         print(f"Error: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+GPX_NS = '{http://www.topografix.com/GPX/1/1}'
+TRKPT_TAGS = frozenset({'trkpt', GPX_NS + 'trkpt'})
+ELE_TAGS = frozenset({'ele', GPX_NS + 'ele'})
+
+
+@lru_cache(maxsize=32)
+def _parse_gpx_points(gpx_path, mtime, duration):
+    # Single pass over the tree, matching namespaced and plain track points
+    root = ET.parse(gpx_path).getroot()
+    trkpts = [el for el in root.iter() if el.tag in TRKPT_TAGS]
+    total = len(trkpts)
+
+    points = []
+    for idx, trkpt in enumerate(trkpts):
+        ele = next((child for child in trkpt if child.tag in ELE_TAGS), None)
+        points.append({
+            'timestamp': idx / total * duration,
+            'lat': float(trkpt.get('lat', 0)),
+            'lon': float(trkpt.get('lon', 0)),
+            'altitude': float(ele.text) if ele is not None and ele.text else None
+        })
+    return tuple(points)
+
+
+def load_gpx_points(gpx_path, duration):
+    """
+    Parse track points from a GPX file, spreading timestamps evenly over
+    the video duration. Results are cached per file path and mtime, so
+    reprocessing a video does not re-parse an unchanged track. Callers get
+    fresh dicts, never the cached ones.
+    """
+    gpx_path = Path(gpx_path)
+    return [dict(p) for p in _parse_gpx_points(str(gpx_path), gpx_path.stat().st_mtime, duration)]
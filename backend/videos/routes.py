@@ -1,22 +1,28 @@
 import pymongo
 import os
+import re
+import json
+import shutil
+import threading
 import time
+import traceback
 from datetime import datetime
 import boto3
 import base64
 from pathlib import Path
+from functools import lru_cache
 from werkzeug.utils import secure_filename
-from flask import Blueprint, jsonify, request, Response, send_file
+from flask import Blueprint, current_app, jsonify, request, Response, send_file
 from bson import ObjectId, json_util
 from pymongo import DESCENDING
 import cv2
 import io
 from PIL import Image
 
-from db import get_db
+from db import get_db, get_client
 from utils.ids import get_now_iso
 from utils.rbac import role_required
-from utils.extract_gpx import extract_gpx
+from utils.extract_gpx import extract_gpx, load_gpx_points
 videos_bp = Blueprint("videos", __name__)
 from config import Config
 # from services.sagemaker_processor import SageMakerVideoProcessor
@@ -24,6 +30,18 @@ from config import Config
 config = Config()
 aws_session = boto3.Session(region_name=config.AWS_REGION)
 
+# Demo annotated videos are named {CATEGORY}_{INDEX}_{ORIGINAL}_annotated_compressed.mp4
+DEMO_CATEGORY_RE = re.compile(
+    r"(oia|corridor_pavement|corridor_structure|directional_signage|its|roadway_lighting)"
+)
+
+# Fields a client may set through the status endpoint
+STATUS_UPDATE_FIELDS = frozenset({"status", "progress", "eta", "storage_url", "thumbnail_url"})
+
+# File extensions recognised in the video library
+LIBRARY_VIDEO_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.webm'})
+LIBRARY_IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.webp'})
+
 @videos_bp.get("/")
 @role_required(["admin", "surveyor", "viewer"])
 def list_videos():
@@ -110,16 +128,15 @@ def create_video():
 @role_required(["admin", "surveyor"])
 def update_status(video_id: str):
     body = request.get_json(silent=True) or {}
-    allowed = {"status", "progress", "eta", "storage_url", "thumbnail_url"}
-    update = {k: v for k, v in body.items() if k in allowed}
+    update = {k: v for k, v in body.items() if k in STATUS_UPDATE_FIELDS}
 
     if not update:
         return jsonify({"error": "no fields"}), 400
 
     update["updated_at"] = get_now_iso()
     db = get_db()
-    res = db.videos.find_one_and_update({"_id": ObjectId(video_id)}, {"$set": update})
-    if not res:
+    res = db.videos.update_one({"_id": ObjectId(video_id)}, {"$set": update})
+    if not res.matched_count:
         return jsonify({"error": "not found"}), 404
 
     return jsonify({"ok": True})
@@ -333,9 +350,6 @@ def process_video_with_ai(video_id: str):
     Process video with SageMaker endpoint - extracts frames, runs inference, creates annotated video
     This endpoint is non-blocking - processing happens in background thread
     """
-    import threading
-    from pathlib import Path
-    import glob
 
     db = get_db()
     video = db.videos.find_one({"_id": ObjectId(video_id)})
@@ -378,20 +392,19 @@ def process_video_with_ai(video_id: str):
         # Update to processing first
         db.videos.update_one(
             {"_id": ObjectId(video_id)},
-            {"$set": {"status": "processing", "progress": 0, "updated_at": get_now_iso()}}
+            {
+                "$set": {"status": "processing", "progress": 0, "updated_at": get_now_iso()},
+                "$unset": {"frames_with_detections": ""}
+            }
         )
         
         # Get Flask app for context
-        from flask import current_app
         app = current_app._get_current_object()
 
         def process_demo_in_background():
             with app.app_context():
                 try:
-                    import time
-                    from pymongo import MongoClient
-                    mongo_client = MongoClient(app.config["MONGO_URI"])
-                    mongo_db = mongo_client[app.config["MONGO_DB_NAME"]]
+                    mongo_db = get_client(app)[app.config["MONGO_DB_NAME"]]
                     
                     # Simulate progress
                     for i in range(1, 101, 20):
@@ -406,28 +419,13 @@ def process_video_with_ai(video_id: str):
                     # e.g. corridor_fence_000_2025...
                     category_videos = {}
                     
-                    known_categories = [
-                        "oia", 
-                        "corridor_pavement", 
-                        "corridor_structure", 
-                        "directional_signage", 
-                        "its", 
-                        "roadway_lighting"
-                    ]
-                    
                     primary_annotated_url = None
                     
                     for match in demo_matches:
                         match_name = match.name
                         # Try to match category
-                        found_cat = "default"
-                        for cat in known_categories:
-                            if match_name.startswith(cat):
-                                found_cat = cat
-                                break
-                        
-                        # Fix for categories that might be substrings of each other? 
-                        # In this list, they seem distinct enough.
+                        cat_match = DEMO_CATEGORY_RE.match(match_name)
+                        found_cat = cat_match.group(1) if cat_match else "default"
                         
                         # Build URL
                         # Path relative to uploads
@@ -455,7 +453,6 @@ def process_video_with_ai(video_id: str):
                     
                 except Exception as e:
                     print(f"Error in demo processing: {e}")
-                    import traceback
                     traceback.print_exc()
         
         thread = threading.Thread(target=process_demo_in_background, daemon=True)
@@ -481,25 +478,27 @@ def process_video_with_ai(video_id: str):
     # Update status to processing
     db.videos.update_one(
         {"_id": ObjectId(video_id)},
-        {"$set": {"status": "processing", "progress": 0, "updated_at": get_now_iso()}}
+        {
+            "$set": {"status": "processing", "progress": 0, "updated_at": get_now_iso()},
+            # Stored frame stats describe the previous run until this one completes
+            "$unset": {"frames_with_detections": ""}
+        }
     )
 
     # Get Flask app for context
-    from flask import current_app
     app = current_app._get_current_object()
 
     # Start background processing
     def process_in_background():
         with app.app_context():
             try:
-                import json
 
                 # Setup paths with absolute path
                 upload_root = Path(os.getenv("UPLOAD_DIR") or str(Path(__file__).resolve().parents[1] / "uploads"))
                 upload_root = upload_root.resolve()  # Ensure absolute path
 
                 # Handle storage_url which might be relative or absolute
-                storage_filename = storage_url.lstrip("/uploads/").lstrip("/")
+                storage_filename = storage_url.removeprefix("/uploads/").lstrip("/")
                 video_path = upload_root / storage_filename
 
                 print(f"[PROCESS] Upload root: {upload_root}")
@@ -523,18 +522,12 @@ def process_video_with_ai(video_id: str):
                 if not original_video_path.exists():
                     if not video_path.exists():
                         raise FileNotFoundError(f"Source video not found at: {video_path}")
-                    import shutil
                     shutil.copy2(str(video_path), str(original_video_path))
 
                 print(f"[PROCESS] Starting SageMaker processing for video {video_id}")
 
-                # Initialize SageMaker processor
-                processor = SageMakerVideoProcessor()
-
-                # Get MongoDB client directly (not using get_db() to avoid Flask context issues in callback)
-                from pymongo import MongoClient
-                mongo_client = MongoClient(app.config["MONGO_URI"])
-                mongo_db = mongo_client[app.config["MONGO_DB_NAME"]]
+                # Use the shared client directly (not get_db(), which needs a request context)
+                mongo_db = get_client(app)[app.config["MONGO_DB_NAME"]]
 
                 # Progress callback to update database
                 def update_progress(progress: int, message: str):
@@ -544,7 +537,7 @@ def process_video_with_ai(video_id: str):
                     )
                     print(f"[PROCESS] {message} ({progress}%)")
 
-                # Process video
+                # Process video, reusing the processor that passed the endpoint health check above
                 result = processor.process_video(
                     video_path=original_video_path,
                     output_dir=upload_root,  # Pass upload_root directly
@@ -560,33 +553,13 @@ def process_video_with_ai(video_id: str):
                 # Link frames to GPX data if available
                 if gpx_file_url:
                     try:
-                        gpx_path = upload_root / gpx_file_url.lstrip("/uploads/")
+                        gpx_path = upload_root / gpx_file_url.removeprefix("/uploads/")
                         print(f"[PROCESS] GPX path: {gpx_path}")
-                        print(f"[PROCESS] GPX exists: {gpx_path.exists()}")
-                        if gpx_path.exists():
-                            # Parse GPX file
-                            import xml.etree.ElementTree as ET
-                            tree = ET.parse(str(gpx_path))
-                            root = tree.getroot()
-
-                            # Extract GPX points with timestamps
-                            ns = {'gpx': 'http://www.topografix.com/GPX/1/1'}
-                            gpx_data = []
-                            for idx, trkpt in enumerate(root.findall('.//gpx:trkpt', ns) or root.findall('.//trkpt')):
-                                lat = float(trkpt.get('lat', 0))
-                                lon = float(trkpt.get('lon', 0))
-                                ele = trkpt.find('gpx:ele', ns) or trkpt.find('ele')
-                                altitude = float(ele.text) if ele is not None and ele.text else None
-
-                                # Estimate timestamp based on position if not available
-                                timestamp = idx / len(list(root.findall('.//gpx:trkpt', ns) or root.findall('.//trkpt'))) * result['duration']
-
-                                gpx_data.append({
-                                    'timestamp': timestamp,
-                                    'lat': lat,
-                                    'lon': lon,
-                                    'altitude': altitude
-                                })
+                        gpx_exists = gpx_path.exists()
+                        print(f"[PROCESS] GPX exists: {gpx_exists}")
+                        if gpx_exists:
+                            # Extract GPX points, timestamps spread over the video duration
+                            gpx_data = load_gpx_points(gpx_path, result['duration'])
 
                             # Link frames to GPX
                             metadata_path = output_dirs["metadata"] / f"{video_id}_frame_metadata.json"
@@ -599,7 +572,7 @@ def process_video_with_ai(video_id: str):
 
                             # Save linked metadata
                             with open(metadata_path, 'w') as f:
-                                json.dump(linked_frames, f, indent=2)
+                                json.dump(linked_frames, f, separators=(",", ":"))
 
                             print(f"[PROCESS] Linked {len(linked_frames)} frames to GPX data")
                     except Exception as e:
@@ -632,6 +605,7 @@ def process_video_with_ai(video_id: str):
                         "total_detections": result.get("total_detections", 0),
                         "detections_summary": result.get("detections_summary", {}),
                         "processed_frames": result.get("processed_frames", 0),
+                        "frames_with_detections": result.get("frames_with_detections", 0),
                         "updated_at": get_now_iso()
                     }}
                 )
@@ -640,13 +614,10 @@ def process_video_with_ai(video_id: str):
 
             except Exception as e:
                 print(f"[PROCESS] Error processing video {video_id}: {e}")
-                import traceback
                 traceback.print_exc()
 
                 # Update status to failed
-                from pymongo import MongoClient
-                mongo_client = MongoClient(app.config["MONGO_URI"])
-                mongo_db = mongo_client[app.config["MONGO_DB_NAME"]]
+                mongo_db = get_client(app)[app.config["MONGO_DB_NAME"]]
                 mongo_db.videos.update_one(
                     {"_id": ObjectId(video_id)},
                     {"$set": {
@@ -670,7 +641,7 @@ def process_video_with_ai(video_id: str):
 @videos_bp.get("/<video_id>/frame_annotated")
 def get_video_frame_annotated(video_id: str):
     db = get_db()
-    video = db.videos.find_one({"_id": ObjectId(video_id)})
+    video = db.videos.find_one({"_id": ObjectId(video_id)}, {"storage_url": 1, "route_id": 1})
 
     if not video:
         return jsonify({"error": "Video not found"}), 404
@@ -721,9 +692,7 @@ def get_video_frame_annotated(video_id: str):
         if not ret or frame is None:
             return jsonify({"error": "Failed to read frame from video"}), 500
 
-        print(frame.shape)
-        frame_height = frame.shape[0]
-        frame_width = frame.shape[1]
+        frame_height, frame_width = frame.shape[:2]
         # # Optional resize
         # width = request.args.get("width", type=int)
         # height = request.args.get("height", type=int)
@@ -740,20 +709,28 @@ def get_video_frame_annotated(video_id: str):
         # query = { "frame_number": frame_number}
         # query = {"route_id": route_id, "frame_number": frame_number}
         # print(query, "query")
-        frame_db_info = db.frames.find_one(query, sort=[('created_at', pymongo.DESCENDING)])
-        detections = frame_db_info.get("detections", [])
-        annotclasses = request.args.getlist("class")
+        annotclasses = set(request.args.getlist("class"))
+        # Filter detections by class server-side so only the requested ones are transferred
+        detections_expr = "$detections"
+        if annotclasses:
+            detections_expr = {"$filter": {
+                "input": {"$ifNull": ["$detections", []]},
+                "as": "det",
+                "cond": {"$in": ["$$det.class_name", sorted(annotclasses)]},
+            }}
+        frame_db_info = next(db.frames.aggregate([
+            {"$match": query},
+            {"$sort": {"created_at": pymongo.DESCENDING}},
+            {"$limit": 1},
+            {"$project": {"detections": detections_expr}},
+        ]), None)
+        detections = frame_db_info.get("detections", []) if frame_db_info else []
         # print(frame_db_info, "frame")
         print(f"Annotating frame for class: {annotclasses}")
 
         if not frame_db_info:
             print(f"No detection data found for frame {frame_number}")
             annotated_frame = frame
-        else:
-            if annotclasses:
-                detections = [det for det in detections if det.get("class_name") in annotclasses]
-            # print(f"Detections to annotate: {detections}")
-            # annotated_frame = sgm.draw_detections(frame.copy(), detections)
 
         # Convert BGR to RGB
         # frame_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
@@ -763,10 +740,7 @@ def get_video_frame_annotated(video_id: str):
         pil_image = Image.fromarray(frame_rgb)
         img_io = io.BytesIO()
         pil_image.save(img_io, 'JPEG', quality=85)
-        img_io.seek(0)
-
-        img_bytes = img_io.read()
-        base64_image = base64.b64encode(img_bytes).decode('utf-8')
+        base64_image = base64.b64encode(img_io.getvalue()).decode('ascii')
 
         return jsonify({
             "frame_number": frame_number,
@@ -787,6 +761,73 @@ def get_video_frame_annotated(video_id: str):
         print(f"Error extracting frame from video {video_id}: {e}")
         return jsonify({"error": f"Failed to extract frame: {str(e)}"}), 500
 
+
+class FrameExtractionError(Exception):
+    """Raised by _render_frame_jpeg; carries the HTTP status for the response."""
+
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+
+@lru_cache(maxsize=64)
+def _render_frame_jpeg(video_path: str, mtime: float, timestamp, frame_number, width, height):
+    """
+    Decode a single frame and encode it as JPEG.
+    Cached per file path/mtime and request parameters, since the player and
+    map views re-request the same frames while scrubbing.
+    Returns (frame_number, jpeg_bytes); raises FrameExtractionError so that
+    failures are never cached.
+    """
+    # Open video file
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FrameExtractionError("Failed to open video file")
+
+    # Get video properties
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    # Determine which frame to extract
+    if timestamp is not None:
+        # Calculate frame number from timestamp
+        frame_number = int(timestamp * fps)
+    elif frame_number is None:
+        # Default to first frame
+        frame_number = 0
+
+    # Validate frame number
+    if frame_number < 0 or frame_number >= total_frames:
+        cap.release()
+        raise FrameExtractionError(f"Frame number {frame_number} out of range (0-{total_frames-1})", 400)
+
+    # Seek to the specific frame
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+    ret, frame = cap.read()
+    cap.release()
+
+    if not ret or frame is None:
+        raise FrameExtractionError("Failed to read frame from video")
+
+    # Optional resize
+    if width or height:
+        h, w = frame.shape[:2]
+        if width and not height:
+            height = int(h * (width / w))
+        elif height and not width:
+            width = int(w * (height / h))
+        frame = cv2.resize(frame, (width, height))
+
+    # Convert BGR to RGB
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    # Convert to PIL Image and save to bytes
+    pil_image = Image.fromarray(frame_rgb)
+    img_io = io.BytesIO()
+    pil_image.save(img_io, 'JPEG', quality=85)
+    return frame_number, img_io.getvalue()
+
+
 @videos_bp.get("/<video_id>/frame")
 def get_video_frame(video_id: str):
     """
@@ -803,7 +844,7 @@ def get_video_frame(video_id: str):
     Example: /api/videos/<id>/frame?timestamp=5.5&annotated=true
     """
     db = get_db()
-    video = db.videos.find_one({"_id": ObjectId(video_id)})
+    video = db.videos.find_one({"_id": ObjectId(video_id)}, {"storage_url": 1, "annotated_video_url": 1})
 
     if not video:
         return jsonify({"error": "Video not found"}), 404
@@ -832,68 +873,23 @@ def get_video_frame(video_id: str):
         return jsonify({"error": "Video file not found on server"}), 404
 
     try:
-        # Open video file
-        cap = cv2.VideoCapture(str(video_path))
-        if not cap.isOpened():
-            return jsonify({"error": "Failed to open video file"}), 500
-
-        # Get video properties
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-        # Determine which frame to extract
-        timestamp = request.args.get("timestamp", type=float)
-        frame_number = request.args.get("frame_number", type=int)
-
-        if timestamp is not None:
-            # Calculate frame number from timestamp
-            frame_number = int(timestamp * fps)
-        elif frame_number is None:
-            # Default to first frame
-            frame_number = 0
-
-        # Validate frame number
-        if frame_number < 0 or frame_number >= total_frames:
-            cap.release()
-            return jsonify({
-                "error": f"Frame number {frame_number} out of range (0-{total_frames-1})"
-            }), 400
-
-        # Seek to the specific frame
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        ret, frame = cap.read()
-        cap.release()
-
-        if not ret or frame is None:
-            return jsonify({"error": "Failed to read frame from video"}), 500
-
-        # Optional resize
-        width = request.args.get("width", type=int)
-        height = request.args.get("height", type=int)
-        if width or height:
-            h, w = frame.shape[:2]
-            if width and not height:
-                height = int(h * (width / w))
-            elif height and not width:
-                width = int(w * (height / h))
-            frame = cv2.resize(frame, (width, height))
-
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Convert to PIL Image and save to bytes
-        pil_image = Image.fromarray(frame_rgb)
-        img_io = io.BytesIO()
-        pil_image.save(img_io, 'JPEG', quality=85)
-        img_io.seek(0)
-
+        frame_number, jpeg_bytes = _render_frame_jpeg(
+            str(video_path),
+            video_path.stat().st_mtime,
+            request.args.get("timestamp", type=float),
+            request.args.get("frame_number", type=int),
+            request.args.get("width", type=int),
+            request.args.get("height", type=int),
+        )
         return send_file(
-            img_io,
+            io.BytesIO(jpeg_bytes),
             mimetype='image/jpeg',
             as_attachment=False,
             download_name=f"frame_{frame_number}.jpg"
         )
 
+    except FrameExtractionError as e:
+        return jsonify({"error": str(e)}), e.status
     except Exception as e:
         print(f"Error extracting frame from video {video_id}: {e}")
         return jsonify({"error": f"Failed to extract frame: {str(e)}"}), 500
@@ -906,10 +902,9 @@ def get_video_metadata(video_id: str):
     Fetch the frame metadata JSON file for a specific video.
     This contains all detections for each frame with timestamps and coordinates.
     """
-    import json
 
     db = get_db()
-    video = db.videos.find_one({"_id": ObjectId(video_id)})
+    video = db.videos.find_one({"_id": ObjectId(video_id)}, {"frame_metadata_url": 1})
 
     if not video:
         return jsonify({"error": "Video not found"}), 404
@@ -1006,13 +1001,14 @@ def list_from_library():
             
             url_path = f"/uploads/{relative_path}"
 
-            if ext in ['.mp4', '.mov', '.avi', '.mkv', '.webm']:
+            if ext in LIBRARY_VIDEO_EXTENSIONS:
                 grouped_data[group_key]['video_path'] = relative_path
                 grouped_data[group_key]['video_url'] = url_path
-                grouped_data[group_key]['size_bytes'] = item.stat().st_size
-                grouped_data[group_key]['last_modified'] = datetime.fromtimestamp(item.stat().st_mtime).isoformat()
+                stat = item.stat()
+                grouped_data[group_key]['size_bytes'] = stat.st_size
+                grouped_data[group_key]['last_modified'] = datetime.fromtimestamp(stat.st_mtime).isoformat()
             
-            elif ext in ['.jpg', '.jpeg', '.png', '.webp']:
+            elif ext in LIBRARY_IMAGE_EXTENSIONS:
                 grouped_data[group_key]['thumb_path'] = relative_path
                 grouped_data[group_key]['thumb_url'] = url_path
 
@@ -10,6 +10,7 @@ import sys
 import json
 import base64
 import time
+from collections import Counter
 from io import BytesIO
 from PIL import Image
 import cv2
@@ -136,7 +137,7 @@ out = cv2.VideoWriter(OUTPUT_VIDEO, fourcc, fps, (width, height))
 
 frame_count = 0
 processed_count = 0
-detection_stats = {}
+detection_stats = Counter()
 inference_times = []
 first_detection_shown = False
 
@@ -254,7 +255,7 @@ while frame_count < frames_to_process:
                     )
                     
                     # Track detection stats
-                    detection_stats[class_name] = detection_stats.get(class_name, 0) + 1
+                    detection_stats[class_name] += 1
             
             # Write annotated frame
             out.write(draw_frame)
@@ -318,8 +319,7 @@ if detection_stats:
     print("-" * 70)
     total_detections = sum(detection_stats.values())
     
-    for class_name, count in sorted(detection_stats.items(), 
-                                   key=lambda x: x[1], reverse=True):
+    for class_name, count in detection_stats.most_common():
         avg_per_frame = count / processed_count
         percentage = (count / total_detections) * 100
         print(f"{class_name:<20} {count:<10} {avg_per_frame:<15.2f} {percentage:.1f}%")
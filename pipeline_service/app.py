@@ -9,6 +9,7 @@ import os
 import sys
 from pathlib import Path
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import time
 from pymongo import MongoClient
 from bson import ObjectId
@@ -43,6 +44,9 @@ db = client[DB_NAME]
 # Upload directory
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", str(Path(__file__).resolve().parents[1] / "backend" / "uploads"))
 
+# Number of videos processed concurrently by the worker (defaults to serial; raise to opt in)
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "1"))
+
 # Processing worker status
 worker_running = False
 
@@ -87,12 +91,16 @@ def process_job(job_id):
         # Update video status
         db.videos.update_one(
             {"_id": ObjectId(video_id)},
-            {"$set": {"status": "processing", "progress": 0, "updated_at": get_now_iso()}}
+            {
+                "$set": {"status": "processing", "progress": 0, "updated_at": get_now_iso()},
+                # Stored frame stats describe the previous run until this one completes
+                "$unset": {"frames_with_detections": ""}
+            }
         )
 
         # Get paths
         upload_root = Path(UPLOAD_DIR)
-        input_path = upload_root / storage_url.lstrip("/uploads/")
+        input_path = upload_root / storage_url.removeprefix("/uploads/")
 
         # Generate output filename
         input_filename = input_path.stem
@@ -181,29 +189,37 @@ def worker():
     global worker_running
     worker_running = True
 
-    print("ML Pipeline Worker started")
-
-    while worker_running:
-        try:
-            # Find pending job
-            job = db.processing_jobs.find_one_and_update(
-                {"status": "pending"},
-                {"$set": {"status": "claimed", "updated_at": get_now_iso()}},
-                sort=[("created_at", 1)]
-            )
-
-            if job:
-                print(f"Found job {job['_id']}")
-                process_job(str(job["_id"]))
-            else:
-                # No jobs, sleep for a bit
-                time.sleep(5)
-
-        except Exception as e:
-            print(f"Worker error: {e}")
-            import traceback
-            traceback.print_exc()
-            time.sleep(10)
+    print(f"ML Pipeline Worker started (max {MAX_CONCURRENT_JOBS} concurrent jobs)")
+
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS, thread_name_prefix="ml-job") as executor:
+        while worker_running:
+            try:
+                # Wait for a free slot before claiming another job
+                if len(in_flight) >= MAX_CONCURRENT_JOBS:
+                    _, in_flight = wait(in_flight, timeout=5, return_when=FIRST_COMPLETED)
+                    continue
+
+                # Find pending job
+                job = db.processing_jobs.find_one_and_update(
+                    {"status": "pending"},
+                    {"$set": {"status": "claimed", "updated_at": get_now_iso()}},
+                    sort=[("created_at", 1)]
+                )
+
+                if job:
+                    print(f"Found job {job['_id']}")
+                    in_flight.add(executor.submit(process_job, str(job["_id"])))
+                else:
+                    # No jobs, sleep for a bit
+                    in_flight = {f for f in in_flight if not f.done()}
+                    time.sleep(5)
+
+            except Exception as e:
+                print(f"Worker error: {e}")
+                import traceback
+                traceback.print_exc()
+                time.sleep(10)
 
     print("ML Pipeline Worker stopped")
 